@@ -41,6 +41,7 @@ START_TIMEOUT = 30 # seconds
 STOP_TIMEOUT = 5
 REQ_TIMEOUT = 3
 REQ_RETRIES = 3
+STREAM_LIMIT = 65536 # bytes buffered by the StreamReader before the transport is paused
 
 
 class XcomApiWriteException(Exception):
@@ -71,6 +72,7 @@ class XcomApiBase:
         """
         self._started = False
         self._connected = False
+        self._connected_fut: asyncio.Future | None = None
 
         # Diagnostics gathering
         self._diag_retries = {}
@@ -97,15 +99,33 @@ class XcomApiBase:
         return self._connected
 
 
+    def _getConnectedFuture(self) -> asyncio.Future:
+        """Future that is resolved once the Xcom client connects. Created on first use within the running loop."""
+        if self._connected_fut is None:
+            self._connected_fut = asyncio.get_running_loop().create_future()
+        return self._connected_fut
+
+
+    def _setConnected(self):
+        """Mark the Xcom client as connected and wake up anyone waiting for it"""
+        self._connected = True
+
+        fut = self._getConnectedFuture()
+        if not fut.done():
+            fut.set_result(True)
+
+
     async def _waitConnected(self, timeout) -> bool:
         """Wait for Xcom client to connect. Or timout."""
+        if self._connected:
+            return True
+
         try:
-            for i in range(timeout):
-                if self._connected:
-                    return True
-                
-                await asyncio.sleep(1)
+            # Shield the future so a timeout does not cancel it for other waiters
+            return await asyncio.wait_for(asyncio.shield(self._getConnectedFuture()), timeout)
 
+        except asyncio.TimeoutError:
+            pass
         except Exception as e:
             _LOGGER.warning(f"Exception while checking connection to Xcom client: {e}")
 
@@ -133,19 +153,21 @@ class XcomApiBase:
         retries = retries or REQ_RETRIES
         timeout = timeout or REQ_TIMEOUT
 
+        # Compose the request once; each retry sends the same package
+        request: XcomPackage = XcomPackage.genPackage(
+            service_id = SCOM_SERVICE.READ,
+            object_type = SCOM_OBJ_TYPE.fromObjType(parameter.obj_type),
+            object_id = parameter.nr,
+            property_id = SCOM_QSP_ID.UNSAVED_VALUE if parameter.obj_type == OBJ_TYPE.PARAMETER else SCOM_QSP_ID.VALUE,
+            property_data = XcomData.NONE,
+            dst_addr = dstAddr
+        )
+
         for retry in range(retries):
             try:
                 ts_start = datetime.now()
                 
-                # Compose the request and send it
-                request: XcomPackage = XcomPackage.genPackage(
-                    service_id = SCOM_SERVICE.READ,
-                    object_type = SCOM_OBJ_TYPE.fromObjType(parameter.obj_type),
-                    object_id = parameter.nr,
-                    property_id = SCOM_QSP_ID.UNSAVED_VALUE if parameter.obj_type == OBJ_TYPE.PARAMETER else SCOM_QSP_ID.VALUE,
-                    property_data = XcomData.NONE,
-                    dst_addr = dstAddr
-                )
+                # Send the request
                 response = await self._sendPackage(request, timeout=timeout, verbose=verbose)
 
                 # Update diagnostics
@@ -192,19 +214,21 @@ class XcomApiBase:
         retries = retries or REQ_RETRIES
         timeout = timeout or REQ_TIMEOUT
 
+        # Compose the request once; each retry sends the same package
+        request: XcomPackage = XcomPackage.genPackage(
+            service_id = SCOM_SERVICE.READ,
+            object_type = SCOM_OBJ_TYPE.MULTI_INFO,
+            object_id = 0x01020304,
+            property_id = SCOM_QSP_ID.VALUE,
+            property_data = prop.getBytes(),
+            dst_addr = 101
+        )
+
         for retry in range(retries):
             try:
                 ts_start = datetime.now()
                 
-                # Compose the request and send it
-                request: XcomPackage = XcomPackage.genPackage(
-                    service_id = SCOM_SERVICE.READ,
-                    object_type = SCOM_OBJ_TYPE.MULTI_INFO,
-                    object_id = 0x01020304,
-                    property_id = SCOM_QSP_ID.VALUE,
-                    property_data = prop.getBytes(),
-                    dst_addr = 101
-                )
+                # Send the request
                 await self._sendPackage(request, timeout=timeout, verbose=verbose)
 
                 # Update diagnostics
@@ -233,13 +257,13 @@ class XcomApiBase:
         """
         # Sanity check: the parameter/datapoint must have obj_type == OBJ_TYPE.PARAMETER
         if parameter.obj_type != OBJ_TYPE.PARAMETER:
-            _LOGGER.warn(f"Ignoring attempt to update readonly infos value {parameter}")
+            _LOGGER.warning("Ignoring attempt to update readonly infos value %s", parameter)
             return None
 
         if type(dstAddr) is str:
             dstAddr = XcomDeviceFamilies.getAddrByCode(dstAddr)
 
-        _LOGGER.debug(f"Update value {parameter} on addr {dstAddr}")
+        _LOGGER.debug("Update value %s on addr %s", parameter, dstAddr)
 
         # Sometimes the Xcom client does not seem to pickup a request
         # so retry if needed
@@ -247,18 +271,20 @@ class XcomApiBase:
         retries = retries or REQ_RETRIES
         timeout = timeout or REQ_TIMEOUT
 
+        # Compose the request once; each retry sends the same package
+        request: XcomPackage = XcomPackage.genPackage(
+            service_id = SCOM_SERVICE.WRITE,
+            object_type = SCOM_OBJ_TYPE.PARAMETER,
+            object_id = parameter.nr,
+            property_id = SCOM_QSP_ID.UNSAVED_VALUE,
+            property_data = XcomData.pack(value, parameter.format),
+            dst_addr = dstAddr
+        )
+
         for retry in range(retries):
             try:
                 ts_start = datetime.now()
                 
-                request: XcomPackage = XcomPackage.genPackage(
-                    service_id = SCOM_SERVICE.WRITE,
-                    object_type = SCOM_OBJ_TYPE.PARAMETER,
-                    object_id = parameter.nr,
-                    property_id = SCOM_QSP_ID.UNSAVED_VALUE,
-                    property_data = XcomData.pack(value, parameter.format),
-                    dst_addr = dstAddr
-                )
                 response = await self._sendPackage(request, timeout=timeout, verbose=verbose)
 
                 # Update diagnostics
@@ -343,9 +369,14 @@ class XcomApiTcp(XcomApiBase):
         if not self._started:
             _LOGGER.info(f"Xcom TCP server start listening on port {self.localPort}")
 
-            self._server = await asyncio.start_server(self._client_connected_callback, "0.0.0.0", self.localPort, limit=1000, family=socket.AF_INET)
-            self._server._start_serving()
+            # Mark as started before awaiting, so a concurrent start cannot open a second server
             self._started = True
+            try:
+                self._server = await asyncio.start_server(self._client_connected_callback, "0.0.0.0", self.localPort, limit=STREAM_LIMIT, family=socket.AF_INET)
+                self._server._start_serving()
+            except:
+                self._started = False
+                raise
         else:
             _LOGGER.info(f"Xcom TCP server already listening on port {self.localPort}")
 
@@ -361,13 +392,19 @@ class XcomApiTcp(XcomApiBase):
         Stop listening to the the Xcom Client and stop the Xcom Server.
         """
         _LOGGER.info(f"Stopping Xcom TCP server")
-        try:
-            self._connected = False
+        self._connected = False
+        self._connected_fut = None
+
+        # Take over the writer and server in a single step, so a concurrent stop cannot close them twice
+        writer, self._writer = self._writer, None
+        server, self._server = self._server, None
+        self._reader = None
 
+        try:
             # Close the writer; we do not need to close the reader
-            if self._writer:
-                self._writer.close()
-                await self._writer.wait_closed()
+            if writer:
+                writer.close()
+                await writer.wait_closed()
     
         except Exception as e:
             _LOGGER.warning(f"Exception during closing of Xcom writer: {e}")
@@ -375,9 +412,9 @@ class XcomApiTcp(XcomApiBase):
         # Close the server
         try:
             async with asyncio.timeout(STOP_TIMEOUT):
-                if self._server:
-                    self._server.close()
-                    await self._server.wait_closed()
+                if server:
+                    server.close()
+                    await server.wait_closed()
     
         except asyncio.TimeoutError:
             pass
@@ -394,7 +431,7 @@ class XcomApiTcp(XcomApiBase):
         """
         self._reader: asyncio.StreamReader = reader
         self._writer: asyncio.StreamWriter = writer
-        self._connected = True
+        self._setConnected()
 
         peername = self._writer.get_extra_info("peername")
         _LOGGER.info(f"Connected to Xcom client '{peername}'")
@@ -409,7 +446,7 @@ class XcomApiTcp(XcomApiBase):
             XcomApiTimeoutException
         """
         if not self._connected:
-            _LOGGER.warning(f"_sendPackage - not connected")
+            _LOGGER.warning("_sendPackage - not connected")
             return None
         
         async with self._sendPackageLock:
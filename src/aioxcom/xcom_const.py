@@ -222,10 +222,23 @@ class SCOM_ERROR_CODES:
     def __repr__(self):
         return self.name
 
+    # Static variable to cache helper mapping
+    _name_map = None
+
+    @staticmethod
+    def _buildNameMap():
+        """Fill static variable once"""
+        if SCOM_ERROR_CODES._name_map is None:
+            SCOM_ERROR_CODES._name_map = {}
+            for key,val in SCOM_ERROR_CODES.__dict__.items():
+                if type(key) is str and type(val) is bytes:
+                    SCOM_ERROR_CODES._name_map.setdefault(val, key)
+
     @staticmethod
     def getByData(data: bytes):
-        for key,val in SCOM_ERROR_CODES.__dict__.items():
-            if type(key) is str and type(val) is bytes and val==data:
-                return key
+        SCOM_ERROR_CODES._buildNameMap()
+        key = SCOM_ERROR_CODES._name_map.get(bytes(data), None)
+        if key is not None:
+            return key
 
         return f"unknown error '{data.hex()}'"
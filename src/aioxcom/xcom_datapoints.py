@@ -8,7 +8,7 @@ import aiofiles
 import logging
 import orjson
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from .xcom_const import (
     LEVEL,
@@ -25,7 +25,7 @@ class XcomDatapointUnknownException(Exception):
     pass
 
 
-@dataclass
+@dataclass(slots=True)
 class XcomDatapoint:
     family_id: str
     level: LEVEL
@@ -40,6 +40,14 @@ class XcomDatapoint:
     max: float|str = None
     inc: float|str = None
     options: dict = None
+    _enum_keys: dict = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        # Build the reverse lookup for enum_key once instead of scanning the options on each call
+        if isinstance(self.options, dict):
+            self._enum_keys = {}
+            for key,val in self.options.items():
+                self._enum_keys.setdefault(val, int(key))
 
     @staticmethod
     def from_dict(d):
@@ -99,27 +107,31 @@ class XcomDatapoint:
             return None
         
         key = str(key)
-        if not isinstance(self.options, dict) or key not in self.options:
+        if not isinstance(self.options, dict):
             return key
         else:
-            return self.options[key]
+            return self.options.get(key, key)
     
     def enum_key(self, value):
         if self.format not in [FORMAT.LONG_ENUM, FORMAT.SHORT_ENUM]:
             return None
         
-        if not isinstance(self.options, dict) or value not in self.options.values():
+        if self._enum_keys is None:
             return None
         else:
-            key = next((key for key,val in self.options.items() if val==value), None)
-            return int(key)
+            return self._enum_keys.get(value, None)
 
 
 
 class XcomDataset:
 
     def __init__(self, datapoints: list[XcomDatapoint] | None = None):
-        self._datapoints = datapoints
+        self._datapoints: tuple[XcomDatapoint, ...] = tuple(datapoints or [])
+
+        # Helper mappings to cache lookups, filled on first use
+        self._nr_map: dict[tuple[int, str|None], XcomDatapoint] | None = None
+        self._name_map: dict[tuple[str, str|None], XcomDatapoint] | None = None
+        self._menu_map: dict[tuple[int, str|None], list[XcomDatapoint]] | None = None
    
 
     @staticmethod
@@ -128,28 +140,65 @@ class XcomDataset:
         The actual XcomDataset list is kept in a separate json file to reduce the memory size needed to load the integration.
         The list is only loaded during config flow and during initial startup, and then released again.
         """
-        path_120vac = __file__.replace('.py', '_120v.json')   # Override values for 120 Vac
-        path_240vac = __file__.replace('.py', '_240v.json')   # Base values for both 120 Vac and 240 Vac
+        path_120vac, path_240vac = XcomDataset._getPaths()
 
-        async with aiofiles.open(path_120vac, "r", encoding="UTF-8") as file_120vac:
-            text_120vac = await file_120vac.read()
         async with aiofiles.open(path_240vac, "r", encoding="UTF-8") as file_240vac:
             text_240vac = await file_240vac.read()
-        
-        values_120vac = orjson.loads(text_120vac)
-        values_240vac = orjson.loads(text_240vac)
 
-        datapoints_120vac = list(filter(None, [XcomDatapoint.from_dict(val) for val in values_120vac]))
+        # The 120v overrides are only read and parsed when actually needed
+        text_120vac = None
+        if voltage == VOLTAGE.AC120:
+            async with aiofiles.open(path_120vac, "r", encoding="UTF-8") as file_120vac:
+                text_120vac = await file_120vac.read()
+
+        return XcomDataset._fromJson(voltage, text_240vac, text_120vac)
+
+
+    @staticmethod
+    def createSync(voltage: str):
+        """
+        Same as create, for callers without a running event loop (e.g. test fixtures).
+        """
+        path_120vac, path_240vac = XcomDataset._getPaths()
+
+        with open(path_240vac, "r", encoding="UTF-8") as file_240vac:
+            text_240vac = file_240vac.read()
+
+        text_120vac = None
+        if voltage == VOLTAGE.AC120:
+            with open(path_120vac, "r", encoding="UTF-8") as file_120vac:
+                text_120vac = file_120vac.read()
+
+        return XcomDataset._fromJson(voltage, text_240vac, text_120vac)
+
+
+    @staticmethod
+    def _getPaths() -> tuple[str, str]:
+        path_120vac = __file__.replace('.py', '_120v.json')   # Override values for 120 Vac
+        path_240vac = __file__.replace('.py', '_240v.json')   # Base values for both 120 Vac and 240 Vac
+        return (path_120vac, path_240vac)
+
+
+    @staticmethod
+    def _fromJson(voltage: str, text_240vac: str, text_120vac: str | None):
+        values_240vac = orjson.loads(text_240vac)
         datapoints_240vac = list(filter(None, [XcomDatapoint.from_dict(val) for val in values_240vac]))
 
         # start with the 240v list as base
         datapoints = datapoints_240vac
 
         if voltage == VOLTAGE.AC120:
+            values_120vac = orjson.loads(text_120vac)
+            datapoints_120vac = list(filter(None, [XcomDatapoint.from_dict(val) for val in values_120vac]))
+
             # Merge the 120v list into the 240v one by replacing duplicates. This maintains the order of menu items
+            index_map = {}
+            for idx,dp240 in enumerate(datapoints):
+                index_map.setdefault((dp240.family_id, dp240.nr), idx)
+
             for dp120 in datapoints_120vac:
                 # already in result?
-                index = next( (idx for idx,dp240 in enumerate(datapoints) if dp120.nr == dp240.nr and dp120.family_id == dp240.family_id ), None)
+                index = index_map.get((dp120.family_id, dp120.nr), None)
                 if index is not None:
                     datapoints[index] = dp120
 
@@ -164,27 +213,55 @@ class XcomDataset:
         return XcomDataset(datapoints)
 
 
+    def _buildNrMap(self):
+        """Fill helper mapping once; keyed on (nr, family_id) and on (nr, None) for any family"""
+        if self._nr_map is None:
+            self._nr_map = {}
+            for point in self._datapoints:
+                self._nr_map.setdefault((point.nr, point.family_id), point)
+                self._nr_map.setdefault((point.nr, None), point)
+
+
+    def _buildNameMap(self):
+        """Fill helper mapping once; keyed on (name, family_id) and on (name, None) for any family"""
+        if self._name_map is None:
+            self._name_map = {}
+            for point in self._datapoints:
+                self._name_map.setdefault((point.name, point.family_id), point)
+                self._name_map.setdefault((point.name, None), point)
+
+
+    def _buildMenuMap(self):
+        """Fill helper mapping once; keyed on (parent, family_id) and on (parent, None) for any family"""
+        if self._menu_map is None:
+            self._menu_map = {}
+            for point in self._datapoints:
+                self._menu_map.setdefault((point.parent, point.family_id), []).append(point)
+                if point.family_id is not None:
+                    self._menu_map.setdefault((point.parent, None), []).append(point)
+
+
     def getByNr(self, nr: int, family_id: str|None = None) -> XcomDatapoint:
-        for point in self._datapoints:
-            if point.nr == nr and (point.family_id == family_id or family_id is None):
-                return point
+        self._buildNrMap()
+        point = self._nr_map.get((nr, family_id), None)
+        if point is not None:
+            return point
 
         raise XcomDatapointUnknownException(nr, family_id)
     
 
     def getByName(self, name: str, family_id: str|None = None) -> XcomDatapoint:
-        for point in self._datapoints:
-            if point.name == name and (point.family_id == family_id or family_id is None):
-                return point
+        self._buildNameMap()
+        point = self._name_map.get((name, family_id), None)
+        if point is not None:
+            return point
 
         raise XcomDatapointUnknownException(name, family_id)
     
 
     def getMenuItems(self, parent: int = 0, family_id: str|None = None):
-        datapoints = []
-        for point in self._datapoints:
-            if point.parent == parent and (point.family_id == family_id or family_id is None):
-                datapoints.append(point)
+        self._buildMenuMap()
 
-        return datapoints
+        # Return a copy so callers cannot modify the cached list
+        return list(self._menu_map.get((parent, family_id), []))
 
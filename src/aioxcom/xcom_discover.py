@@ -5,9 +5,8 @@ import asyncio
 import ipaddress
 import logging
 import os
-import struct
 
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 
 from .xcom_api import (
     XcomApiBase,
@@ -42,60 +41,107 @@ class XcomDiscoveredDevice:
 
 class XcomDiscover:
 
-    def __init__(self, api: XcomApiBase, dataset: XcomDataset):
+    def __init__(self, api: XcomApiBase, dataset: XcomDataset, cacheExtendedInfo = False):
         """
         MOXA is connecting to the TCP Server we are creating here.
         Once it is connected we can send package requests.
+
+        With cacheExtendedInfo, repeated discoveries on this instance reuse the extended info
+        of devices that responded before, instead of requesting it again.
         """
         self._api = api
         self._dataset = dataset
 
+        # Extended info of devices, keyed on family and address
+        self._cache: dict[tuple[str, int], XcomDiscoveredDevice] | None = {} if cacheExtendedInfo else None
+
 
     async def discoverDevices(self, getExtendedInfo = False, verbose = False) -> list[XcomDiscoveredDevice]:
         """
         Discover which Studer devices can be reached via the Xcom client
         """
+        # Probe all families concurrently; results are kept in family order
+        families = XcomDeviceFamilies.getList()
+        results = await asyncio.gather(*[self._discoverFamilyDevices(family, verbose) for family in families], return_exceptions=True)
+
         devices: list[XcomDiscoveredDevice] = []
+        for family, result in zip(families, results):
+            if isinstance(result, Exception):
+                _LOGGER.info(f"No devices for family {family.id}: {result}")
+                continue
+
+            devices.extend(result)
 
-        for family in XcomDeviceFamilies.getList():
+        if not getExtendedInfo:
+            return devices
 
-            _LOGGER.info(f"Trying family {family.id} ({family.model})")
+        if self._cache is None:
+            return await asyncio.gather(*[self.getExtendedDeviceInfo(device, verbose=verbose) for device in devices])
 
-            # Get value for the specific discovery nr, or otherwise the first info nr or first param nr
-            nr = family.nrDiscover or family.nrInfosStart or family.nrParamsStart or None
-            if not nr:
+        # Reuse the extended info of devices of the same family that responded on the same address before
+        missing: list[XcomDiscoveredDevice] = []
+        for device in devices:
+            cached = self._cache.get( (device.family_id, device.addr) )
+            if cached is None:
+                missing.append(device)
                 continue
 
-            # Iterate all addresses in the family, up to the first address that is not found
-            for device_addr in range(family.addrDevicesStart, family.addrDevicesEnd+1):
+            _LOGGER.info(f"Using cached extended device info for device {device.code}")
+            device.device_model = cached.device_model
+            device.hw_version   = cached.hw_version
+            device.sw_version   = cached.sw_version
+            device.fid          = cached.fid
 
-                device_code = family.getCode(device_addr)
+        await asyncio.gather(*[self.getExtendedDeviceInfo(device, verbose=verbose) for device in missing])
 
-                # Send the test request to the device. This will return None in case:
-                # - the device does not exist (DEVICE_NOT_FOUND)
-                # - the device does not support the param (INVALID_DATA), used to distinguish BSP from BMS
-                try:
-                    param = self._dataset.getByNr(nr, family.idForNr)
+        # Only keep complete results; a missing value may be a transient failure that is retried next time
+        for device in missing:
+            if self._hasExtendedInfo(device):
+                self._cache[(device.family_id, device.addr)] = replace(device)
+
+        return devices
+
+
+    async def _discoverFamilyDevices(self, family, verbose = False) -> list[XcomDiscoveredDevice]:
+        """
+        Discover which devices of a specific family can be reached via the Xcom client
+        """
+        devices: list[XcomDiscoveredDevice] = []
+
+        _LOGGER.info(f"Trying family {family.id} ({family.model})")
 
-                    _LOGGER.info(f"Trying device {device_code} on {device_addr} for nr {nr}")
-                    value = await self._api.requestValue(param, device_addr, verbose=verbose)
-                    if value is not None:
-                        _LOGGER.info(f"  Found device {device_code} via {nr}:{device_addr}")
+        # Get value for the specific discovery nr, or otherwise the first info nr or first param nr
+        nr = family.nrDiscover or family.nrInfosStart or family.nrParamsStart or None
+        if not nr:
+            return devices
 
-                        device = XcomDiscoveredDevice(device_code, device_addr, family.id, family.model)
-                        if getExtendedInfo:
-                            device = await self.getExtendedDeviceInfo(device, verbose=verbose)
-                        
-                        devices.append(device)
+        # Iterate all addresses in the family, up to the first address that is not found
+        for device_addr in range(family.addrDevicesStart, family.addrDevicesEnd+1):
 
-                    else:
-                        _LOGGER.info(f"  No device {device_code}; no value returned from Xcom client: {e}")
+            device_code = family.getCode(device_addr)
 
-                except Exception as e:
-                    _LOGGER.info(f"  No device {device_code}; no test value returned from Xcom client: {e}")
+            # Send the test request to the device. This will return None in case:
+            # - the device does not exist (DEVICE_NOT_FOUND)
+            # - the device does not support the param (INVALID_DATA), used to distinguish BSP from BMS
+            try:
+                param = self._dataset.getByNr(nr, family.idForNr)
+
+                _LOGGER.info(f"Trying device {device_code} on {device_addr} for nr {nr}")
+                value = await self._api.requestValue(param, device_addr, verbose=verbose)
+                if value is not None:
+                    _LOGGER.info(f"  Found device {device_code} via {nr}:{device_addr}")
 
-                    # Do not test further device addresses in this family
-                    break
+                    device = XcomDiscoveredDevice(device_code, device_addr, family.id, family.model)
+                    devices.append(device)
+
+                else:
+                    _LOGGER.info(f"  No device {device_code}; no value returned from Xcom client")
+
+            except Exception as e:
+                _LOGGER.info(f"  No device {device_code}; no test value returned from Xcom client: {e}")
+
+                # Do not test further device addresses in this family
+                break
 
         return devices
 
@@ -111,13 +157,11 @@ class XcomDiscover:
             _LOGGER.info(f"Trying to get extended device info for device {device.code})")
             family = XcomDeviceFamilies.getById(device.family_id)
 
-            id_type    = await self._requestValueByName("ID type",     family.id, device.addr, verbose=verbose)
-            id_hw      = await self._requestValueByName("ID HW",       family.id, device.addr, verbose=verbose)
-            id_hw_pwr  = await self._requestValueByName("ID HW PWR",   family.id, device.addr, verbose=verbose)
-            id_sw_msb  = await self._requestValueByName("ID SOFT msb", family.id, device.addr, verbose=verbose)
-            id_sw_lsb  = await self._requestValueByName("ID SOFT lsb", family.id, device.addr, verbose=verbose)
-            id_fid_msb = await self._requestValueByName("ID FID msb",  family.id, device.addr, verbose=verbose)
-            id_fid_lsb = await self._requestValueByName("ID FID lsb",  family.id, device.addr, verbose=verbose)
+            # Request all ids at once instead of one after the other
+            (id_type, id_hw, id_hw_pwr, id_sw_msb, id_sw_lsb, id_fid_msb, id_fid_lsb) = await asyncio.gather(
+                *[self._requestValueByName(name, family.id, device.addr, verbose=verbose) for name in
+                    ["ID type", "ID HW", "ID HW PWR", "ID SOFT msb", "ID SOFT lsb", "ID FID msb", "ID FID lsb"]]
+            )
 
             device.device_model = self._decodeType(id_type, "ID type", family.idForNr)
             device.hw_version   = self._decodeIdHW(id_hw, id_hw_pwr)
@@ -132,6 +176,11 @@ class XcomDiscover:
         return device
 
 
+    def _hasExtendedInfo(self, device: XcomDiscoveredDevice) -> bool:
+        # device_model is not required; it is only known for families whose ID type has options
+        return None not in (device.hw_version, device.sw_version, device.fid)
+
+
     async def _requestValueByName(self, param_name, family_id, device_addr, verbose=False):
         try:
             param = self._dataset.getByName(param_name, family_id)
@@ -153,11 +202,11 @@ class XcomDiscover:
         if cmd is None:
             return None
         
-        bytes_cmd = struct.pack(">H", int(cmd))
+        bytes_cmd = int(cmd).to_bytes(2, "big")
         if pwr is None:
             return f"{int(bytes_cmd[0])}.{int(bytes_cmd[1])}"
         else:
-            bytes_pwr = struct.pack(">H", int(pwr))
+            bytes_pwr = int(pwr).to_bytes(2, "big")
             return f"{int(bytes_cmd[0])}.{int(bytes_cmd[1])} / {int(bytes_pwr[0])}.{int(bytes_pwr[1])}"
 
 
@@ -165,7 +214,7 @@ class XcomDiscover:
         if msb is None or lsb is None:
             return None
         
-        bytes = struct.pack(">H", int(msb)) + struct.pack(">H", int(lsb))
+        bytes = int(msb).to_bytes(2, "big") + int(lsb).to_bytes(2, "big")
         return f"{int(bytes[0])}.{int(bytes[2])}.{int(bytes[3])}"
 
 
@@ -173,7 +222,7 @@ class XcomDiscover:
         if msb is None or lsb is None:
             return None
         
-        bytes = struct.pack(">H", int(msb)) + struct.pack(">H", int(lsb))
+        bytes = int(msb).to_bytes(2, "big") + int(lsb).to_bytes(2, "big")
         return bytes.hex(' ',4).upper()
 
 
@@ -132,16 +132,29 @@ class XcomDeviceFamilies:
 
     @staticmethod
     def getById(id: str) -> XcomDeviceFamily:
-        for f in XcomDeviceFamilies.getList():
-            if id == f.id:
-                return f
+        """Lookup the id to find the family"""
+        XcomDeviceFamilies._buildIdMap()
+        family = XcomDeviceFamilies._id_map.get(id, None)
+        if family is not None:
+            return family
 
         raise XcomDeviceFamilyUnknownException(id)
     
 
-    # Static variable to cache helper mapping
+    # Static variables to cache helper mappings
+    _list = None
+    _id_map = None
     _addr_map = None
 
+    @staticmethod
+    def _buildIdMap():
+        """Fill static variable once"""
+        if XcomDeviceFamilies._id_map is None:
+            XcomDeviceFamilies._id_map = {}
+            for f in XcomDeviceFamilies.getList():
+                XcomDeviceFamilies._id_map.setdefault(f.id, f)
+
+
     @staticmethod
     def _buildAddrMap():
         """Fill static variable once"""
@@ -160,9 +173,12 @@ class XcomDeviceFamilies:
         if addr is not None:
             return addr
     
-        raise XcomDeviceCodeUnknownException(str)
+        raise XcomDeviceCodeUnknownException(code)
 
 
     @staticmethod
     def getList() -> list[XcomDeviceFamily]:
-        return [val for val in XcomDeviceFamilies.__dict__.values() if type(val) is XcomDeviceFamily]
+        if XcomDeviceFamilies._list is None:
+            XcomDeviceFamilies._list = [val for val in XcomDeviceFamilies.__dict__.values() if type(val) is XcomDeviceFamily]
+
+        return list(XcomDeviceFamilies._list)
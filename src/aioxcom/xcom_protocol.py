@@ -10,6 +10,7 @@
 
 import asyncio
 import binascii
+import itertools
 import logging
 import struct
 from io import BufferedWriter, BufferedReader, BytesIO
@@ -23,32 +24,72 @@ from .xcom_const import (
 _LOGGER = logging.getLogger(__name__)
 
 
+# Precompiled structs for the fixed size data formats, avoids parsing the format string on each call
+_STRUCT_BOOL   = struct.Struct("<?")     # 1 byte, little endian, bool
+_STRUCT_UINT16 = struct.Struct("<H")     # 2 bytes, little endian, unsigned short/int16
+_STRUCT_FLOAT  = struct.Struct("<f")     # 4 bytes, little endian, float
+_STRUCT_INT32  = struct.Struct("<i")     # 4 bytes, little endian, signed long/int32
+_STRUCT_UINT32 = struct.Struct("<I")     # 4 bytes, little endian, unsigned long/int32
+
+_STRUCT_HEADER = struct.Struct("<BIIH")     # frame_flags, src_addr, dst_addr and data_length, 1+4+4+2 bytes
+_STRUCT_FRAME  = struct.Struct("<Bs2sI2s")  # service_flags, service_id, object_type, object_id and property_id, 1+1+2+4+2 bytes
+
+_STRUCT_MULTI_INFO_REQ_ITEM = struct.Struct("<HB")   # user_info_ref and aggregation_type, 2+1 bytes
+_STRUCT_MULTI_INFO_RSP      = struct.Struct("<II")   # flags and datetime, 2x 4 bytes
+_STRUCT_MULTI_INFO_RSP_ITEM = struct.Struct("<HBf")  # user_info_ref, aggregation_type and value, 2+1+4 bytes
+
+# Fixed size data formats and their precompiled struct, looked up once instead of matching format by format
+_FORMAT_STRUCTS = {
+    FORMAT.BOOL:       _STRUCT_BOOL,
+    FORMAT.ERROR:      _STRUCT_UINT16,
+    FORMAT.FORMAT:     _STRUCT_UINT16,
+    FORMAT.SHORT_ENUM: _STRUCT_UINT16,
+    FORMAT.FLOAT:      _STRUCT_FLOAT,
+    FORMAT.INT32:      _STRUCT_INT32,
+    FORMAT.LONG_ENUM:  _STRUCT_UINT32,
+}
+
+
 class XcomData:
     NONE = b''
 
     @staticmethod
     def unpack(value: bytes, format):
+        fixed = _FORMAT_STRUCTS.get(format)
+        if fixed is not None:
+            return fixed.unpack(value)[0]
+
         match format:
-            case FORMAT.BOOL: return struct.unpack("<?", value)[0]          # 1 byte, little endian, bool
-            case FORMAT.ERROR: return struct.unpack("<H", value)[0]         # 2 bytes, little endian, unsigned short/int16
-            case FORMAT.FORMAT: return struct.unpack("<H", value)[0]        # 2 bytes, little endian, unsigned short/int16
-            case FORMAT.SHORT_ENUM: return struct.unpack("<H", value)[0]    # 2 bytes, little endian, unsigned short/int16
-            case FORMAT.FLOAT: return struct.unpack("<f", value)[0]         # 4 bytes, little endian, float
-            case FORMAT.INT32: return struct.unpack("<i", value)[0]         # 4 bytes, little endian, signed long/int32
-            case FORMAT.LONG_ENUM: return struct.unpack("<I", value)[0]     # 4 bytes, little endian, unsigned long/int32
-            case FORMAT.STRING: return value.decode('iso-8859-15')          # n bytes, ISO_8859-15 string of 8 bit characters
-            case _: raise TypeError("Unknown data format '{format}")
+            case FORMAT.STRING: return value.decode('iso-8859-15')              # n bytes, ISO_8859-15 string of 8 bit characters
+            case _: raise TypeError(f"Unknown data format '{format}'")
 
     @staticmethod
     def pack(value, format) -> bytes:
+        fixed = _FORMAT_STRUCTS.get(format)
+        if fixed is not None:
+            return fixed.pack(float(value) if format == FORMAT.FLOAT else int(value))
+
         match format:
-            case FORMAT.BOOL: return struct.pack("<?", int(value))               # 1 byte, little endian, bool
-            case FORMAT.SHORT_ENUM: return struct.pack("<H", int(value))         # 2 bytes, little endian, unsigned short/int16
-            case FORMAT.FLOAT: return struct.pack("<f", float(value))              # 4 bytes, little endian, float
-            case FORMAT.INT32: return struct.pack("<i", int(value))              # 4 bytes, little endian, signed long/int32
-            case FORMAT.LONG_ENUM: return struct.pack("<I", int(value))          # 4 bytes, little endian, unsigned long/int32
-            case FORMAT.STRING: return value.encode('iso-8859-15')         # n bytes, ISO_8859-15 string of 8 bit characters
-            case _: raise TypeError("Unknown data format '{format}")
+            case FORMAT.STRING: return value.encode('iso-8859-15')             # n bytes, ISO_8859-15 string of 8 bit characters
+            case _: raise TypeError(f"Unknown data format '{format}'")
+
+    @staticmethod
+    def pack_into(buf: bytearray, offset: int, value, format) -> int:
+        """
+        Pack the value directly into a preallocated buffer at the given offset.
+        Returns the number of bytes written.
+        """
+        fixed = _FORMAT_STRUCTS.get(format)
+        if fixed is not None:
+            fixed.pack_into(buf, offset, float(value) if format == FORMAT.FLOAT else int(value))
+            return fixed.size
+
+        match format:
+            case FORMAT.STRING:
+                data = value.encode('iso-8859-15')
+                buf[offset:offset+len(data)] = data
+                return len(data)
+            case _: raise TypeError(f"Unknown data format '{format}'")
 
     @staticmethod
     def cast(value: float, format):
@@ -61,7 +102,7 @@ class XcomData:
             case FORMAT.INT32: return int(value)
             case FORMAT.LONG_ENUM: return int(value)
             case FORMAT.STRING: return value.decode('iso-8859-15') 
-            case _: raise TypeError(f"Unknown data format '{format}")
+            case _: raise TypeError(f"Unknown data format '{format}'")
 
 
 class XcomDataMultiInfoReqItem():
@@ -82,16 +123,20 @@ class XcomDataMultiInfoReq:
     def append(self, item: XcomDataMultiInfoReqItem):
         self.items.append(item)
 
+    @staticmethod
+    def parseBytes(buf: bytes):
+        req = XcomDataMultiInfoReq()
+        req.items = [XcomDataMultiInfoReqItem(*fields) for fields in _STRUCT_MULTI_INFO_REQ_ITEM.iter_unpack(buf)]
+        return req
+
     def assemble(self, f: BufferedWriter):
-        _LOGGER.debug(f"XcomDataMultiInfoReq assemble {len(self.items)} items")
-        for item in self.items:
-            writeUInt16(f, item.user_info_ref)
-            writeUInt8(f, item.aggregation_type)
+        _LOGGER.debug("XcomDataMultiInfoReq assemble %d items", len(self.items))
+        f.write(self.getBytes())
 
     def getBytes(self) -> bytes:
-        buf = BytesIO()
-        self.assemble(buf)
-        return buf.getvalue()
+        # Pack all items with a single struct call instead of two writes per item
+        fmt = "<" + "HB" * len(self.items)
+        return struct.pack(fmt, *itertools.chain.from_iterable((item.user_info_ref, item.aggregation_type) for item in self.items))
 
     def __len__(self) -> int:
         return 3 * len(self.items)
@@ -117,31 +162,30 @@ class XcomDataMultiInfoRsp:
     items: list[XcomDataMultiInfoRspItem]
 
     @staticmethod
-    def parse(f: BufferedReader, len: int):
-        flags = readUInt32(f)
-        datetime= readUInt32(f)
-        items = list()
-
-        while len >= 7:
-            item = XcomDataMultiInfoRspItem()
-            item.user_info_ref = readUInt16(f)
-            item.aggregation_type = readUInt8(f)
-            item.value = readFloat(f)
-            len = len - 7
-
-            items.append(item)
-
-        return XcomDataMultiInfoRsp(flags, datetime, items)
+    def parse(f: BufferedReader, length: int):
+        return XcomDataMultiInfoRsp.parseBytes(f.read(length))
     
     @staticmethod
     def parseBytes(buf: bytes):
-        bio = BytesIO(buf)
-        return XcomDataMultiInfoRsp.parse(bio, bio.getbuffer().nbytes)    
+        flags, datetime = _STRUCT_MULTI_INFO_RSP.unpack_from(buf, 0)
+
+        # Decode all complete items in one pass; any trailing partial item is ignored
+        start = _STRUCT_MULTI_INFO_RSP.size
+        end = len(buf) - (len(buf) - start) % _STRUCT_MULTI_INFO_RSP_ITEM.size
+        items = [XcomDataMultiInfoRspItem(*fields) for fields in _STRUCT_MULTI_INFO_RSP_ITEM.iter_unpack(memoryview(buf)[start:end])]
+
+        return XcomDataMultiInfoRsp(flags, datetime, items)
         
     def __init__(self, flags, datetime, items):
-        flags = None
-        datetime = None
-        items = list()
+        self.flags = flags
+        self.datetime = datetime
+        self.items = items
+
+    def getBytes(self) -> bytes:
+        # Collect all parts first and join them at the end, one allocation instead of growing the buffer per item
+        chunks = [_STRUCT_MULTI_INFO_RSP.pack(self.flags, self.datetime)]
+        chunks.extend(_STRUCT_MULTI_INFO_RSP_ITEM.pack(item.user_info_ref, item.aggregation_type, item.value) for item in self.items)
+        return b''.join(chunks)
 
     def __len__(self) -> int:
         return 2*4 + len(self.items)*(2+1+4)
@@ -242,7 +286,10 @@ class XcomFrame:
 
     @staticmethod
     def parseBytes(buf: bytes):
-        return XcomFrame.parse(BytesIO(buf))
+        (service_flags, service_id, object_type, object_id, property_id) = _STRUCT_FRAME.unpack_from(buf, 0)
+        service = XcomService(object_type, object_id, property_id, bytes(buf[_STRUCT_FRAME.size:]))
+
+        return XcomFrame(service_id, service, service_flags)
 
     def __init__(self, service_id: bytes, service_data: XcomService, service_flags=0):
         assert service_flags >= 0, "service_flag must not be negative"
@@ -258,9 +305,17 @@ class XcomFrame:
         self.service_data.assemble(f)
 
     def getBytes(self) -> bytes:
-        buf = BytesIO()
-        self.assemble(buf)
-        return buf.getvalue()
+        buf = bytearray(len(self))
+        self.packInto(buf, 0)
+        return bytes(buf)
+
+    def packInto(self, buf: bytearray, offset: int):
+        """Write the frame into a preallocated buffer at the given offset"""
+        service = self.service_data
+        _STRUCT_FRAME.pack_into(buf, offset, self.service_flags, self.service_id, service.object_type, service.object_id, service.property_id)
+
+        start = offset + _STRUCT_FRAME.size
+        buf[start:start+len(service.property_data)] = service.property_data
 
     def __len__(self) -> int:
         return 2*1 + len(self.service_data)
@@ -289,7 +344,8 @@ class XcomHeader:
 
     @staticmethod
     def parseBytes(buf: bytes):
-        return XcomHeader.parse(BytesIO(buf))
+        (frame_flags, src_addr, dst_addr, data_length) = _STRUCT_HEADER.unpack(buf)
+        return XcomHeader(src_addr, dst_addr, data_length, frame_flags)
 
     def __init__(self, src_addr: int, dst_addr: int, data_length: int, frame_flags=0):
         assert frame_flags >= 0, "frame_flags must not be negative"
@@ -306,9 +362,11 @@ class XcomHeader:
         writeUInt16(f, self.data_length)
 
     def getBytes(self) -> bytes:
-        buf = BytesIO()
-        self.assemble(buf)
-        return buf.getvalue()
+        return _STRUCT_HEADER.pack(self.frame_flags, self.src_addr, self.dst_addr, self.data_length)
+
+    def packInto(self, buf: bytearray, offset: int):
+        """Write the header into a preallocated buffer at the given offset"""
+        _STRUCT_HEADER.pack_into(buf, offset, self.frame_flags, self.src_addr, self.dst_addr, self.data_length)
 
     def __len__(self) -> int:
         return self.length
@@ -327,24 +385,35 @@ class XcomPackage:
     @staticmethod
     async def parse(f: asyncio.StreamReader, verbose=False):
         # package sometimes starts with 0xff
-        skipped = bytearray(b'')
+        # Skip everything up to and including the start-byte in one read from the stream buffer
         while True:
-            sb = await f.read(1)
-            if sb == XcomPackage.start_byte:
+            try:
+                skipped = await f.readuntil(XcomPackage.start_byte)
                 break
 
-            skipped.extend(sb)
+            except asyncio.LimitOverrunError as e:
+                # More bytes than the stream limit without a start-byte; drop them and keep looking
+                junk = await f.readexactly(e.consumed)
+                if verbose:
+                    _LOGGER.debug(f"skip {len(junk)} bytes without start-byte")
+
+        sb = skipped[-1:]
+        skipped = skipped[:-1]
 
         if verbose and len(skipped) > 0:
             _LOGGER.debug(f"skip {len(skipped)} bytes until start-byte ({binascii.hexlify(skipped).decode('ascii')})")
 
-        h_raw = await f.read(XcomHeader.length)
-        h_chk = await f.read(2)
+        # Read header plus its checksum in one go; it holds the length of the remainder of the package
+        h_all = await f.readexactly(XcomHeader.length + 2)
+        h_raw = h_all[:-2]
+        h_chk = h_all[-2:]
         assert checksum(h_raw) == h_chk
         header = XcomHeader.parseBytes(h_raw)
 
-        f_raw = await f.read(header.data_length)
-        f_chk = await f.read(2)
+        # Then read frame plus its checksum in one go
+        f_all = await f.readexactly(header.data_length + 2)
+        f_raw = f_all[:-2]
+        f_chk = f_all[-2:]
         assert checksum(f_raw) == f_chk
         frame = XcomFrame.parseBytes(f_raw)
 
@@ -363,10 +432,34 @@ class XcomPackage:
 
     @staticmethod
     async def parseBytes(buf: bytes):
-        reader = asyncio.StreamReader()
-        reader.feed_data(buf)
+        return XcomPackage.parseBytesSync(buf)
+
+    @staticmethod
+    def parseBytesSync(buf: bytes):
+        """
+        Parse a package that is already completely available in buf.
+        No StreamReader and no awaits are needed for that.
+        """
+        # Accept any bytes-like buffer (bytearray, memoryview); bytes input is used as-is without a copy
+        buf = bytes(buf)
+
+        # package sometimes starts with 0xff
+        start = buf.index(XcomPackage.start_byte) + 1
+
+        h_end = start + XcomHeader.length
+        h_raw = buf[start:h_end]
+        h_chk = buf[h_end:h_end+2]
+        assert checksum(h_raw) == h_chk
+        header = XcomHeader.parseBytes(h_raw)
+
+        f_start = h_end + 2
+        f_end = f_start + header.data_length
+        f_raw = buf[f_start:f_end]
+        f_chk = buf[f_end:f_end+2]
+        assert checksum(f_raw) == f_chk
+        frame = XcomFrame.parseBytes(f_raw)
 
-        return await XcomPackage.parse(reader)
+        return XcomPackage(header, frame)
     
     @staticmethod
     def genPackage(service_id: bytes,
@@ -383,28 +476,49 @@ class XcomPackage:
 
         return XcomPackage(header, frame)
 
+    @staticmethod
+    def genResponse(request,
+            service_flags: int,
+            property_data: bytes):
+        """
+        Compose the response package for a request, without modifying the request itself.
+        Source and destination addresses are swapped.
+        """
+        req_service = request.frame_data.service_data
+
+        service = XcomService(req_service.object_type, req_service.object_id, req_service.property_id, property_data)
+        frame = XcomFrame(request.frame_data.service_id, service, service_flags)
+        header = XcomHeader(request.header.dst_addr, request.header.src_addr, len(frame), request.header.frame_flags)
+
+        return XcomPackage(header, frame)
+
     def __init__(self, header: XcomHeader, frame_data: XcomFrame):
         self.header = header
         self.frame_data = frame_data
 
     def assemble(self, f: BufferedWriter):
-        f.write(self.start_byte)
-
-        header = self.header.getBytes()
-        f.write(header)
-        f.write(checksum(header))
-
-        data = self.frame_data.getBytes()
-        f.write(data)
-        f.write(checksum(data))
+        f.write(self.getBytes())
 
         # Don't write delimeter, seems not needed as we send the package in one whole chunk
         #f.write(self.delimeters)
 
     def getBytes(self) -> bytes:
-        buf = BytesIO()
-        self.assemble(buf)
-        return buf.getvalue()
+        # Compose start byte, header, checksum, data and checksum in one preallocated buffer
+        h_end = 1 + len(self.header)
+        f_start = h_end + 2
+        f_end = f_start + len(self.frame_data)
+
+        buf = bytearray(f_end + 2)
+        view = memoryview(buf)
+
+        buf[0:1] = self.start_byte
+        self.header.packInto(buf, 1)
+        buf[h_end:f_start] = checksum(view[1:h_end])
+        self.frame_data.packInto(buf, f_start)
+        buf[f_end:] = checksum(view[f_start:f_end])
+
+        view.release()
+        return bytes(buf)
 
     def isResponse(self) -> bool:
         return (self.frame_data.service_flags & 2) >> 1 == 1
@@ -424,22 +538,17 @@ class XcomPackage:
 
 def checksum(data: bytes) -> bytes:
     """Function to calculate the checksum needed for the header and the data"""
-    A = 0xFF
-    B = 0x00
-
-    for d in data:
-        A = (A + d) % 0x100
-        B = (B + A) % 0x100
-
-    A = struct.pack("<B", A)
-    B = struct.pack("<B", B)
+    # A is the running sum of all bytes (starting at 0xFF), B the sum of all intermediate values of A.
+    # Both only need reducing modulo 0x100 at the end, so let sum() and accumulate() do the loop in C.
+    A = 0xFF + sum(data)
+    B = sum(itertools.accumulate(data, initial=0xFF)) - 0xFF
 
-    return A + B
+    return bytes((A & 0xFF, B & 0xFF))
 
 ##
 
 def readFloat(f: BufferedReader) -> float:
-    return float.from_bytes(f.read(4), byteorder="little", signed=True)
+    return _STRUCT_FLOAT.unpack(f.read(4))[0]
 
 
 def readUInt32(f: BufferedReader) -> int:
@@ -1 +1 @@
-from .xcom_testclient import XcomTestClientTcp
+from .xcom_testclient import XcomTestClientTcp, XcomTestContext
@@ -0,0 +1,37 @@
+import pytest
+import pytest_asyncio
+
+from aioxcom import XcomDataset, VOLTAGE
+from . import XcomTestContext
+
+
+# The datasets are only read by the tests, so each can be shared across the whole session.
+# Parsing them needs no event loop, so plain fixtures will do.
+
+@pytest.fixture(scope="session")
+def ac120_dataset():
+    return XcomDataset.createSync(VOLTAGE.AC120)
+
+
+@pytest.fixture(scope="session")
+def ac240_dataset():
+    return XcomDataset.createSync(VOLTAGE.AC240)
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="session")
+async def connected_context(unused_tcp_port_factory):
+    # Prepare; the server and client connection is shared by all tests in a module
+    ctx = XcomTestContext()
+    port = unused_tcp_port_factory()
+
+    # The order of start is important, first server, then client.
+    await ctx.start_server(port)
+    await ctx.start_client(port)
+    await ctx.server._waitConnected(5)
+
+    # pass objects to tests
+    yield ctx
+
+    # cleanup
+    await ctx.stop_client()
+    await ctx.stop_server()
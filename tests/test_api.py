@@ -1,46 +1,22 @@
 import asyncio
-import copy
 import pytest
 import pytest_asyncio
 
-from aioxcom import XcomApiTcp, XcomDataset, XcomData, XcomPackage
+from aioxcom import XcomData, XcomPackage
 from aioxcom import XcomApiTimeoutException, XcomApiResponseIsError
-from aioxcom import VOLTAGE, FORMAT, SCOM_SERVICE, SCOM_OBJ_TYPE, SCOM_QSP_ID, SCOM_ERROR_CODES
-from . import XcomTestClientTcp
+from aioxcom import FORMAT, SCOM_SERVICE, SCOM_OBJ_TYPE, SCOM_QSP_ID, SCOM_ERROR_CODES
+from . import XcomTestContext
 
 
-class TestContext:
-    def __init__(self):
-        self.server = None
-        self.client = None
-
-    async def start_server(self, port):
-        if not self.server:
-            self.server = XcomApiTcp(port)
-
-        await self.server.start(wait_for_connect = False)
-
-    async def stop_server(self):
-        if self.server:
-            await self.server.stop()
-        self.server = None
-
-    async def start_client(self, port):
-        if not self.client:
-            self.client = XcomTestClientTcp(port)
-
-        await self.client.start()
-
-    async def stop_client(self):
-        if self.client:
-            await self.client.stop()
-        self.client = None
+# Packed values used in the parametrize tables below
+_F1234 = XcomData.pack(1234.0, FORMAT.FLOAT)
+_I32 = XcomData.pack(32, FORMAT.INT32)
 
 
 @pytest_asyncio.fixture
 async def context():
     # Prepare
-    ctx = TestContext()
+    ctx = XcomTestContext()
 
     # pass objects to tests
     yield ctx
@@ -90,33 +66,53 @@ async def test_connect(name, start_server, start_client, wait_server, exp_server
 
 @pytest.mark.asyncio
 @pytest.mark.usefixtures("context", "unused_tcp_port")
-@pytest.mark.parametrize(
-    "name, test_nr, test_dest, test_value_update, exp_dst_addr, exp_svc_id, exp_obj_type, exp_obj_id, exp_prop_id, rsp_flags, rsp_data, exp_value, exp_except",
-    [
-        ("request info ok",      3000, 100, None, 100, SCOM_SERVICE.READ, SCOM_OBJ_TYPE.INFO, 3000, SCOM_QSP_ID.VALUE, 0x02, XcomData.pack(1234.0, FORMAT.FLOAT), 1234.0, None),
-        ("request info err",     3000, 100, None, 100, SCOM_SERVICE.READ, SCOM_OBJ_TYPE.INFO, 3000, SCOM_QSP_ID.VALUE, 0x03, SCOM_ERROR_CODES.READ_PROPERTY_FAILED, None, XcomApiResponseIsError),
-        ("request info timeout", 3000, 100, None, 100, SCOM_SERVICE.READ, SCOM_OBJ_TYPE.INFO, 3000, SCOM_QSP_ID.VALUE, 0x00, XcomData.pack(1234.0, FORMAT.FLOAT), None, XcomApiTimeoutException),
-        ("request param ok",     1107, 100, None, 100, SCOM_SERVICE.READ, SCOM_OBJ_TYPE.PARAMETER, 1107, SCOM_QSP_ID.UNSAVED_VALUE, 0x02, XcomData.pack(1234.0, FORMAT.FLOAT), 1234.0, None),
-        ("update param ok",      1107, 100, 4.0,  100, SCOM_SERVICE.WRITE, SCOM_OBJ_TYPE.PARAMETER, 1107, SCOM_QSP_ID.UNSAVED_VALUE, 0x02, b'', True, None),
-        ("update param err",     1107, 100, 4.0,  100, SCOM_SERVICE.WRITE, SCOM_OBJ_TYPE.PARAMETER, 1107, SCOM_QSP_ID.UNSAVED_VALUE, 0x03, SCOM_ERROR_CODES.WRITE_PROPERTY_FAILED, None, XcomApiResponseIsError),
-        ("update param timeout", 1107, 100, 4.0,  100, SCOM_SERVICE.WRITE, SCOM_OBJ_TYPE.PARAMETER, 1107, SCOM_QSP_ID.UNSAVED_VALUE, 0x00, b'', True, XcomApiTimeoutException),
-        ("request param vo",     5012, 501, None, 501, SCOM_SERVICE.READ, SCOM_OBJ_TYPE.PARAMETER, 5012, SCOM_QSP_ID.UNSAVED_VALUE, 0x02, XcomData.pack(32, FORMAT.INT32), 32, None),
-        ("update param vo",      5012, 501, 32,   501, SCOM_SERVICE.WRITE, SCOM_OBJ_TYPE.PARAMETER, 5012, SCOM_QSP_ID.UNSAVED_VALUE, 0x03, SCOM_ERROR_CODES.ACCESS_DENIED, None, XcomApiResponseIsError),
-    ]
-)
-async def test_request(name, test_nr, test_dest, test_value_update, exp_dst_addr, exp_svc_id, exp_obj_type, exp_obj_id, exp_prop_id, rsp_flags, rsp_data, exp_value, exp_except, request):
+async def test_start_stop_concurrent(request):
     context = request.getfixturevalue("context")
     port    = request.getfixturevalue("unused_tcp_port")
 
-    # The order of start is important, first server, then client.
-    await context.start_server(port)
+    # Overlapping starts must open only one server on the port
+    await asyncio.gather(context.start_server(port), context.start_server(port))
     await context.start_client(port)
-
     await context.server._waitConnected(5)
+
+    # Overlapping stops must close the writer and server only once
+    await asyncio.gather(context.server.stop(), context.server.stop())
+    await asyncio.gather(context.client.stop(), context.client.stop())
+
+    assert context.server.connected == False
+    assert context.server._writer is None
+    assert context.server._server is None
+    assert context.client.connected == False
+    assert context.client._writer is None
+
+
+_REQUEST_CASES = [
+    ("request info ok",      3000, 100, None, 100, SCOM_SERVICE.READ, SCOM_OBJ_TYPE.INFO, 3000, SCOM_QSP_ID.VALUE, 0x02, _F1234, 1234.0, None),
+    ("request info err",     3000, 100, None, 100, SCOM_SERVICE.READ, SCOM_OBJ_TYPE.INFO, 3000, SCOM_QSP_ID.VALUE, 0x03, SCOM_ERROR_CODES.READ_PROPERTY_FAILED, None, XcomApiResponseIsError),
+    ("request info timeout", 3000, 100, None, 100, SCOM_SERVICE.READ, SCOM_OBJ_TYPE.INFO, 3000, SCOM_QSP_ID.VALUE, 0x00, _F1234, None, XcomApiTimeoutException),
+    ("request param ok",     1107, 100, None, 100, SCOM_SERVICE.READ, SCOM_OBJ_TYPE.PARAMETER, 1107, SCOM_QSP_ID.UNSAVED_VALUE, 0x02, _F1234, 1234.0, None),
+    ("update param ok",      1107, 100, 4.0,  100, SCOM_SERVICE.WRITE, SCOM_OBJ_TYPE.PARAMETER, 1107, SCOM_QSP_ID.UNSAVED_VALUE, 0x02, b'', True, None),
+    ("update param err",     1107, 100, 4.0,  100, SCOM_SERVICE.WRITE, SCOM_OBJ_TYPE.PARAMETER, 1107, SCOM_QSP_ID.UNSAVED_VALUE, 0x03, SCOM_ERROR_CODES.WRITE_PROPERTY_FAILED, None, XcomApiResponseIsError),
+    ("update param timeout", 1107, 100, 4.0,  100, SCOM_SERVICE.WRITE, SCOM_OBJ_TYPE.PARAMETER, 1107, SCOM_QSP_ID.UNSAVED_VALUE, 0x00, b'', True, XcomApiTimeoutException),
+    ("request param vo",     5012, 501, None, 501, SCOM_SERVICE.READ, SCOM_OBJ_TYPE.PARAMETER, 5012, SCOM_QSP_ID.UNSAVED_VALUE, 0x02, _I32, 32, None),
+    ("update param vo",      5012, 501, 32,   501, SCOM_SERVICE.WRITE, SCOM_OBJ_TYPE.PARAMETER, 5012, SCOM_QSP_ID.UNSAVED_VALUE, 0x03, SCOM_ERROR_CODES.ACCESS_DENIED, None, XcomApiResponseIsError),
+]
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("connected_context", "ac240_dataset")
+@pytest.mark.parametrize(
+    "name, test_nr, test_dest, test_value_update, exp_dst_addr, exp_svc_id, exp_obj_type, exp_obj_id, exp_prop_id, rsp_flags, rsp_data, exp_value, exp_except",
+    _REQUEST_CASES,
+    ids = [case[0] for case in _REQUEST_CASES],
+)
+async def test_request(name, test_nr, test_dest, test_value_update, exp_dst_addr, exp_svc_id, exp_obj_type, exp_obj_id, exp_prop_id, rsp_flags, rsp_data, exp_value, exp_except, request):
+    context = request.getfixturevalue("connected_context")
+
     assert context.server.connected == True
     assert context.client.connected == True
 
-    dataset = await XcomDataset.create(VOLTAGE.AC240)
+    dataset = request.getfixturevalue("ac240_dataset")
     param = dataset.getByNr(test_nr)
 
     # Helper function for client to handle a request and submit a response
@@ -125,11 +121,8 @@ async def test_request(name, test_nr, test_dest, test_value_update, exp_dst_addr
         # Receive the request from the server
         req: XcomPackage = await context.client.receivePackage()
 
-        # Make a deep copy of the request and turn it into a response
-        rsp = copy.deepcopy(req)
-        rsp.frame_data.service_flags = rsp_flags
-        rsp.frame_data.service_data.property_data = rsp_data
-        rsp.header.data_length = len(rsp.frame_data)
+        # Turn the request into a response
+        rsp = XcomPackage.genResponse(req, rsp_flags, rsp_data)
 
         # Send the response back to the server
         await context.client.sendPackage(rsp)
@@ -1,67 +1,61 @@
 import pytest
-import pytest_asyncio
 from aioxcom import XcomDataset, VOLTAGE, FORMAT, OBJ_TYPE, XcomDatapointUnknownException
 
 
-@pytest.mark.asyncio
-async def test_create():
-    dataset120 = await XcomDataset.create(VOLTAGE.AC120)    
-    dataset240 = await XcomDataset.create(VOLTAGE.AC240)
+@pytest.fixture(params=["ac120_dataset", "ac240_dataset"])
+def dataset(request):
+    # Reuse the session-scoped datasets from conftest instead of parsing the files again
+    return request.getfixturevalue(request.param)
 
-    assert len(dataset120._datapoints) == 1435
-    assert len(dataset240._datapoints) == 1435
 
+def test_create(ac120_dataset, ac240_dataset):
+    assert len(ac120_dataset._datapoints) == 1435
+    assert len(ac240_dataset._datapoints) == 1435
 
-@pytest.mark.asyncio
-async def test_nr():
-    dataset = await XcomDataset.create(VOLTAGE.AC240)
 
-    param = dataset.getByNr(1107)
-    assert param.family_id == "xt"
-    assert param.nr == 1107
-    assert param.format == FORMAT.FLOAT
-    assert param.obj_type == OBJ_TYPE.PARAMETER
+@pytest.mark.parametrize("voltage, fixture", [(VOLTAGE.AC120, "ac120_dataset"), (VOLTAGE.AC240, "ac240_dataset")])
+async def test_create_async(voltage, fixture, request):
+    dataset = await XcomDataset.create(voltage)
 
-    param = dataset.getByNr(1552)
-    assert param.family_id == "xt"
-    assert param.nr == 1552
-    assert param.format == FORMAT.LONG_ENUM
-    assert param.obj_type == OBJ_TYPE.PARAMETER
-    assert param.options != None
-    assert type(param.options) is dict
-    assert len(param.options) == 3
+    # Same result as createSync that is used by the session fixtures
+    assert dataset._datapoints == request.getfixturevalue(fixture)._datapoints
+
+
+def test_create_unknown():
+    with pytest.raises(Exception):
+        XcomDataset.createSync("999 Vac")
 
-    param = dataset.getByNr(3000)
-    assert param.family_id == "xt"
-    assert param.nr == 3000
-    assert param.format == FORMAT.FLOAT
-    assert param.obj_type == OBJ_TYPE.INFO
-
-    param = dataset.getByNr(3000, "xt")
-    assert param.family_id == "xt"
-    assert param.nr == 3000
-    assert param.format == FORMAT.FLOAT
-    assert param.obj_type == OBJ_TYPE.INFO
-
-    param = dataset.getByNr(5012, "rcc")
-    assert param.family_id == "rcc"
-    assert param.nr == 5012
-    assert param.format == FORMAT.LONG_ENUM
-    assert param.obj_type == OBJ_TYPE.PARAMETER
-    assert param.options != None
-    assert type(param.options) is dict
 
-    with pytest.raises(XcomDatapointUnknownException):
-        param = dataset.getByNr(9999)
+@pytest.mark.parametrize(
+    "name, nr, family_id, exp_family_id, exp_format, exp_obj_type, exp_options, exp_except",
+    [
+        ("1107",        1107, None,  "xt",  FORMAT.FLOAT,     OBJ_TYPE.PARAMETER, None, None),
+        ("1552",        1552, None,  "xt",  FORMAT.LONG_ENUM, OBJ_TYPE.PARAMETER, 3,    None),
+        ("3000",        3000, None,  "xt",  FORMAT.FLOAT,     OBJ_TYPE.INFO,      None, None),
+        ("3000 xt",     3000, "xt",  "xt",  FORMAT.FLOAT,     OBJ_TYPE.INFO,      None, None),
+        ("5012 rcc",    5012, "rcc", "rcc", FORMAT.LONG_ENUM, OBJ_TYPE.PARAMETER, 5,    None),
+        ("9999",        9999, None,  None,  None,             None,               None, XcomDatapointUnknownException),
+        ("3000 bsp",    3000, "bsp", None,  None,             None,               None, XcomDatapointUnknownException),
+    ]
+)
+def test_nr(name, nr, family_id, exp_family_id, exp_format, exp_obj_type, exp_options, exp_except, dataset):
+    if exp_except is not None:
+        with pytest.raises(exp_except):
+            param = dataset.getByNr(nr, family_id)
+        return
 
-    with pytest.raises(XcomDatapointUnknownException):
-        param = dataset.getByNr(3000, "bsp")
+    param = dataset.getByNr(nr, family_id)
+    assert param.family_id == exp_family_id
+    assert param.nr == nr
+    assert param.format == exp_format
+    assert param.obj_type == exp_obj_type
 
+    if exp_options is not None:
+        assert type(param.options) is dict
+        assert len(param.options) == exp_options
 
-@pytest.mark.asyncio
-async def test_enum():
-    dataset = await XcomDataset.create(VOLTAGE.AC240)
 
+def test_enum(dataset):
     param = dataset.getByNr(1552)
     assert param.options != None
     assert type(param.options) is dict
@@ -78,10 +72,7 @@ async def test_enum():
     assert param.enum_key("1") == None
 
 
-@pytest.mark.asyncio
-async def test_menu():
-    dataset = await XcomDataset.create(VOLTAGE.AC240)
-    
+def test_menu(dataset):
     root_items = dataset.getMenuItems(0)
     assert len(root_items) == 11
 
@@ -0,0 +1,199 @@
+import asyncio
+import pytest
+import pytest_asyncio
+
+from aioxcom import XcomData, XcomDiscover, XcomPackage
+from aioxcom import FORMAT, SCOM_ERROR_CODES
+
+
+# Packed values used in the parametrize tables below
+_F1234 = XcomData.pack(1234.0, FORMAT.FLOAT)
+_I1234 = XcomData.pack(1234, FORMAT.INT32)
+
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def context(connected_context):
+    # Reset the stop signal for the client handler of each test
+    connected_context.client_stop = asyncio.Event()
+
+    yield connected_context
+
+    connected_context.client_stop.set()
+
+
+async def _clientHandler(context, rsp_dest, rsp_table) -> int:
+    """Let the client answer all requests until client_stop is set; returns the number of requests handled"""
+    count = 0
+    stop_task = asyncio.create_task(context.client_stop.wait())
+    try:
+        while True:
+            # Wait for either the next request or the stop signal, without polling
+            recv_task = asyncio.create_task(context.client.receivePackage(timeout=None))
+            done, pending = await asyncio.wait({stop_task, recv_task}, return_when=asyncio.FIRST_COMPLETED)
+            if stop_task in done:
+                recv_task.cancel()
+                break
+
+            req: XcomPackage = recv_task.result()
+            count += 1
+
+            # Turn the request into a response
+            dst_addr = req.header.dst_addr
+            flags, data = rsp_table.get(
+                (dst_addr, req.frame_data.service_data.object_id),
+                (0x03, SCOM_ERROR_CODES.DEVICE_NOT_FOUND if dst_addr not in rsp_dest else SCOM_ERROR_CODES.READ_PROPERTY_FAILED)
+            )
+            rsp = XcomPackage.genResponse(req, flags, data)
+
+            # Send the response back to the server
+            await context.client.sendPackage(rsp)
+    finally:
+        stop_task.cancel()
+
+    return count
+
+
+_DISCOVER_DEVICES_CASES = [
+    ("none",        [],               {},               []),
+    ("xt1",         [101],            {3000: _F1234},   ["XT1"]),
+    ("xt1,xt2,xt3", [101, 102, 103],  {3000: _F1234},   ["XT1", "XT2", "XT3"]),
+    ("l1,l2,l3",    [191, 192, 193],  {3000: _F1234},   ["L1", "L2", "L3"]),
+    ("rcc",         [501],            {5002: _I1234},   ["RCC"]),
+    ("bsp",         [601],            {7036: _F1234},   ["BSP"]),
+    ("bms",         [601],            {7054: _F1234},   ["BMS"]),
+    ("vt1",         [301],            {11000: _F1234},  ["VT1"]),
+    ("vs1",         [701],            {15000: _F1234},  ["VS1"]),
+]
+
+
+@pytest.mark.asyncio(loop_scope="session")
+@pytest.mark.usefixtures("context", "ac240_dataset")
+@pytest.mark.parametrize(
+    "name, rsp_dest, rsp_dict, exp_codes",
+    _DISCOVER_DEVICES_CASES,
+    ids = [case[0] for case in _DISCOVER_DEVICES_CASES],
+)
+async def test_discover_devices(name, rsp_dest, rsp_dict, exp_codes, request):
+    context = request.getfixturevalue("context")
+
+    assert context.server.connected == True
+    assert context.client.connected == True
+
+    dataset = request.getfixturevalue("ac240_dataset")
+
+    # Precompute the response for every (dst_addr, object_id) that is answered with a value
+    rsp_dest = frozenset(rsp_dest)
+    rsp_table = {(addr, object_id): (0x02, data) for addr in rsp_dest for object_id,data in rsp_dict.items()}
+
+    # Start 2 parallel tasks, for server and for client
+    task_server = asyncio.create_task(XcomDiscover(context.server, dataset).discoverDevices())
+    task_client = asyncio.create_task(_clientHandler(context, rsp_dest, rsp_table))
+
+    # Wait for server to finish and check the discovered devices
+    devices = await task_server
+
+    # Signal the client handler to stop and join it; it exits as soon as the event is set
+    context.client_stop.set()
+    await asyncio.wait_for(task_client, 5)
+
+    assert [device.code for device in devices] == exp_codes
+
+
+# Extended info responses for XT1: ID type, ID HW, ID HW PWR, ID SOFT msb/lsb and ID FID msb/lsb
+_XT1_EXTENDED_INFO = {
+    (101, 3124): (0x02, XcomData.pack(256.0, FORMAT.FLOAT)),
+    (101, 3129): (0x02, XcomData.pack(258.0, FORMAT.FLOAT)),
+    (101, 3132): (0x02, XcomData.pack(772.0, FORMAT.FLOAT)),
+    (101, 3130): (0x02, XcomData.pack(258.0, FORMAT.FLOAT)),
+    (101, 3131): (0x02, XcomData.pack(2571.0, FORMAT.FLOAT)),
+    (101, 3156): (0x02, XcomData.pack(4660.0, FORMAT.FLOAT)),
+    (101, 3157): (0x02, XcomData.pack(43981.0, FORMAT.FLOAT)),
+}
+
+
+@pytest.mark.asyncio(loop_scope="session")
+@pytest.mark.usefixtures("context", "ac240_dataset")
+@pytest.mark.parametrize(
+    "name, cache, extended_info, exp_cached",
+    [
+        ("no cache",    False, _XT1_EXTENDED_INFO, False),
+        ("cache",       True,  _XT1_EXTENDED_INFO, True),
+        ("incomplete",  True,  {},                 False),
+    ]
+)
+async def test_discover_cache(name, cache, extended_info, exp_cached, request):
+    context = request.getfixturevalue("context")
+    dataset = request.getfixturevalue("ac240_dataset")
+
+    rsp_dest = frozenset([101])
+    rsp_table = {(101, 3000): (0x02, _F1234)} | extended_info
+
+    discover = XcomDiscover(context.server, dataset, cacheExtendedInfo=cache)
+    counts = []
+    for _ in range(2):
+        context.client_stop = asyncio.Event()
+        task_client = asyncio.create_task(_clientHandler(context, rsp_dest, rsp_table))
+
+        devices = await discover.discoverDevices(getExtendedInfo=True)
+
+        context.client_stop.set()
+        counts.append(await asyncio.wait_for(task_client, 5))
+
+        assert [device.code for device in devices] == ["XT1"]
+        assert devices[0].device_model == ("XTM" if extended_info else None)
+
+    # With a complete cached result, the second run only repeats the detect sweep
+    assert (counts[1] < counts[0]) == exp_cached
+
+
+# Extended info responses for BSP: ID type, ID HW, ID SOFT msb/lsb and ID FID msb/lsb
+_BSP_EXTENDED_INFO = {
+    (601, 7034): (0x02, XcomData.pack(10241.0, FORMAT.FLOAT)),
+    (601, 7037): (0x02, XcomData.pack(258.0, FORMAT.FLOAT)),
+    (601, 7038): (0x02, XcomData.pack(2571.0, FORMAT.FLOAT)),
+    (601, 7048): (0x02, XcomData.pack(4660.0, FORMAT.FLOAT)),
+    (601, 7049): (0x02, XcomData.pack(43981.0, FORMAT.FLOAT)),
+}
+
+
+@pytest.mark.asyncio(loop_scope="session")
+@pytest.mark.usefixtures("context", "ac240_dataset")
+async def test_discover_cache_family(request):
+    context = request.getfixturevalue("context")
+    dataset = request.getfixturevalue("ac240_dataset")
+
+    rsp_dest = frozenset([601])
+    discover = XcomDiscover(context.server, dataset, cacheExtendedInfo=True)
+
+    # BSP and BMS both use address 601; the BSP info cached in the first run must not be applied to a BMS
+    for rsp_table, exp_code, exp_family_id, exp_sw_version in [
+        ({(601, 7036): (0x02, _F1234)} | _BSP_EXTENDED_INFO, "BSP", "bsp", "1.10.11"),
+        ({(601, 7054): (0x02, _F1234)},                      "BMS", "bms", None),
+    ]:
+        context.client_stop = asyncio.Event()
+        task_client = asyncio.create_task(_clientHandler(context, rsp_dest, rsp_table))
+
+        devices = await discover.discoverDevices(getExtendedInfo=True)
+
+        context.client_stop.set()
+        await asyncio.wait_for(task_client, 5)
+
+        assert [(device.code, device.family_id, device.sw_version) for device in devices] == [(exp_code, exp_family_id, exp_sw_version)]
+
+
+@pytest.mark.parametrize(
+    "name, method, args, exp_result",
+    [
+        ("hw",          "_decodeIdHW", (0x0102, None),        "1.2"),
+        ("hw pwr",      "_decodeIdHW", (0x0102, 0x0304),      "1.2 / 3.4"),
+        ("hw none",     "_decodeIdHW", (None, 0x0304),        None),
+        ("sw",          "_decodeIdSW", (258.0, 0x0A0B),       "1.10.11"),
+        ("sw none",     "_decodeIdSW", (0x0102, None),        None),
+        ("fid",         "_decodeFID",  (0x1234, 0xABCD),      "1234ABCD"),
+        ("fid none",    "_decodeFID",  (None, 0xABCD),        None),
+    ]
+)
+def test_decode_ids(name, method, args, exp_result, ac240_dataset):
+    discover = XcomDiscover(None, ac240_dataset)
+
+    assert getattr(discover, method)(*args) == exp_result
@@ -1,4 +1,3 @@
-
 import pytest
 from aioxcom import XcomDeviceFamilies, XcomDeviceFamilyUnknownException, XcomDeviceCodeUnknownException, XcomDeviceAddrUnknownException
 
@@ -8,17 +7,34 @@ def test_list():
     assert len(families) == 9
 
 
-def test_id():
-    families = XcomDeviceFamilies.getList()
-    for family in families:
-        assert family == XcomDeviceFamilies.getById(family.id)
-
-    with pytest.raises(XcomDeviceFamilyUnknownException):
-        family = XcomDeviceFamilies.getById("XXX")
+@pytest.mark.parametrize(
+    "family_id, exp_except",
+    [
+        ("xt",  None),
+        ("l1",  None),
+        ("l2",  None),
+        ("l3",  None),
+        ("rcc", None),
+        ("bsp", None),
+        ("bms", None),
+        ("vt",  None),
+        ("vs",  None),
+        ("XXX", XcomDeviceFamilyUnknownException),
+    ]
+)
+def test_id(family_id, exp_except):
+    if exp_except is None:
+        family = XcomDeviceFamilies.getById(family_id)
+        assert family.id == family_id
+        assert family in XcomDeviceFamilies.getList()
+    else:
+        with pytest.raises(exp_except):
+            family = XcomDeviceFamilies.getById(family_id)
 
 
-def test_addr():
-    tests = {
+@pytest.mark.parametrize(
+    "family_id, addr, code",
+    [
         ("xt", 101, "XT1"),
         ("xt", 109, "XT9"),
         ("l1", 191, "L1"),
@@ -31,11 +47,12 @@ def test_addr():
         ("vt", 315, "VT15"),
         ("vs", 701, "VS1"),
         ("vs", 715, "VS15"),
-    }
-    for (family_id, addr, code) in tests:
-        family = XcomDeviceFamilies.getById(family_id)
-        assert family.getCode(addr) == code
-        assert XcomDeviceFamilies.getAddrByCode(code) == addr
+    ]
+)
+def test_addr(family_id, addr, code):
+    family = XcomDeviceFamilies.getById(family_id)
+    assert family.getCode(addr) == code
+    assert XcomDeviceFamilies.getAddrByCode(code) == addr
 
 
 def test_addr_fail():
@@ -1,13 +1,16 @@
+import asyncio
 import math
 import pytest
-import pytest_asyncio
-from aioxcom import XcomPackage, XcomData, FORMAT
+import struct
+from aioxcom import XcomPackage, XcomData, XcomDataMultiInfoReq, XcomDataMultiInfoReqItem, XcomDataMultiInfoRsp, XcomDataMultiInfoRspItem, FORMAT
 from aioxcom import SCOM_SERVICE, SCOM_OBJ_TYPE, SCOM_QSP_ID, SCOM_ERROR_CODES
+from aioxcom.xcom_protocol import checksum
 
 
-@pytest_asyncio.fixture
-async def package_read_info():
-    yield XcomPackage.genPackage(
+# Plain package factories; each call returns a fresh package, so tests can modify it freely
+
+def _package_read_info():
+    return XcomPackage.genPackage(
         service_id = SCOM_SERVICE.READ,
         object_type = SCOM_OBJ_TYPE.INFO,
         object_id = 0x01020304,
@@ -17,9 +20,8 @@ async def package_read_info():
         dst_addr = 101,
     )
 
-@pytest_asyncio.fixture
-async def package_read_param():
-    yield XcomPackage.genPackage(
+def _package_read_param():
+    return XcomPackage.genPackage(
         service_id = SCOM_SERVICE.READ,
         object_type = SCOM_OBJ_TYPE.PARAMETER,
         object_id = 0x01020304,
@@ -29,9 +31,8 @@ async def package_read_param():
         dst_addr = 101,
     )
 
-@pytest_asyncio.fixture
-async def package_write_param():
-    yield XcomPackage.genPackage(
+def _package_write_param():
+    return XcomPackage.genPackage(
         service_id = SCOM_SERVICE.WRITE,
         object_type = SCOM_OBJ_TYPE.PARAMETER,
         object_id = 0x01020304,
@@ -42,18 +43,21 @@ async def package_write_param():
     )
 
 
+_PACKAGE_PROPS_CASES = [
+    (_package_read_info,   1, 101, SCOM_SERVICE.READ,  0x00, SCOM_OBJ_TYPE.INFO,      0x01020304, SCOM_QSP_ID.VALUE,         b''),
+    (_package_read_param,  1, 101, SCOM_SERVICE.READ,  0x00, SCOM_OBJ_TYPE.PARAMETER, 0x01020304, SCOM_QSP_ID.UNSAVED_VALUE, b''),
+    (_package_write_param, 1, 101, SCOM_SERVICE.WRITE, 0x00, SCOM_OBJ_TYPE.PARAMETER, 0x01020304, SCOM_QSP_ID.UNSAVED_VALUE, b'0A0B0C0D'),
+]
+
+
 @pytest.mark.asyncio
-@pytest.mark.usefixtures("package_read_info", "package_read_param", "package_write_param")
 @pytest.mark.parametrize(
-    "fixture, exp_src_addr, exp_dst_addr, exp_svc_id, exp_svc_flags, exp_obj_type, exp_obj_id, exp_prop_id, exp_prop_data",
-    [
-        ("package_read_info",   1, 101, SCOM_SERVICE.READ,  0x00, SCOM_OBJ_TYPE.INFO,      0x01020304, SCOM_QSP_ID.VALUE,         b''),
-        ("package_read_param",  1, 101, SCOM_SERVICE.READ,  0x00, SCOM_OBJ_TYPE.PARAMETER, 0x01020304, SCOM_QSP_ID.UNSAVED_VALUE, b''),
-        ("package_write_param", 1, 101, SCOM_SERVICE.WRITE, 0x00, SCOM_OBJ_TYPE.PARAMETER, 0x01020304, SCOM_QSP_ID.UNSAVED_VALUE, b'0A0B0C0D'),
-    ]
+    "factory, exp_src_addr, exp_dst_addr, exp_svc_id, exp_svc_flags, exp_obj_type, exp_obj_id, exp_prop_id, exp_prop_data",
+    _PACKAGE_PROPS_CASES,
+    ids = [case[0].__name__.lstrip('_') for case in _PACKAGE_PROPS_CASES],
 )
-async def test_package_props(fixture, exp_src_addr, exp_dst_addr, exp_svc_id, exp_svc_flags, exp_obj_type, exp_obj_id, exp_prop_id, exp_prop_data, request):
-    package: XcomPackage = request.getfixturevalue(fixture)
+async def test_package_props(factory, exp_src_addr, exp_dst_addr, exp_svc_id, exp_svc_flags, exp_obj_type, exp_obj_id, exp_prop_id, exp_prop_data):
+    package: XcomPackage = factory()
 
     assert package.header.src_addr == exp_src_addr
     assert package.header.dst_addr == exp_dst_addr
@@ -83,28 +87,68 @@ async def test_package_props(fixture, exp_src_addr, exp_dst_addr, exp_svc_id, ex
     assert clone.frame_data.service_data.property_data == exp_prop_data
 
 
+def test_package_bytes():
+    # start byte, header, checksum, frame, checksum
+    assert _package_write_param().getBytes() == bytes.fromhex(
+        "aa"
+        "00 01000000 65000000 1200" "7781"
+        "00 02 0200 04030201 0d00 3041304230433044" "e412"
+    )
+
+
+async def test_package_parse_stream():
+    buf = _package_write_param().getBytes()
+
+    reader = asyncio.StreamReader()
+    reader.feed_data(b'\xFF' + buf + buf[:-1])
+    reader.feed_eof()
+
+    # The first package is complete, skipping the leading byte
+    package = await XcomPackage.parse(reader)
+    assert package.getBytes() == buf
+
+    # The second package is truncated
+    with pytest.raises(asyncio.IncompleteReadError):
+        await XcomPackage.parse(reader)
+
+
+async def test_package_parse_junk():
+    buf = _package_write_param().getBytes()
+
+    reader = asyncio.StreamReader(limit=1024)
+    reader.feed_data(b'\xFF' * 5000 + buf)
+    reader.feed_eof()
+
+    # Junk beyond the stream limit without a start-byte is dropped, not left in the buffer
+    package = await XcomPackage.parse(reader)
+    assert package.getBytes() == buf
+
+
+_PACKAGE_FLAGS_CASES = [
+    ("read info req",       _package_read_info,   0x00, b'',         False, False, None),
+    ("read info rsp_ok",    _package_read_info,   0x02, b'',         True,  False, None),
+    ("read info rsp_err",   _package_read_info,   0x03, b'\x2A\x00', True,  True,  "READ_PROPERTY_FAILED"),
+    ("read info rsp_unk",   _package_read_info,   0x03, b'\xFE\xDC', True,  True,  "unknown error 'fedc'"),
+    ("read param req",      _package_read_param,  0x00, b'',         False, False, None),
+    ("read param rsp_ok",   _package_read_param,  0x02, b'',         True,  False, None),
+    ("read param rsp_err",  _package_read_param,  0x03, b'\x2A\x00', True,  True,  "READ_PROPERTY_FAILED"),
+    ("read param rsp_unk",  _package_read_param,  0x03, b'\xFE\xDC', True,  True,  "unknown error 'fedc'"),
+    ("write param req",     _package_write_param, 0x00, b'',         False, False, None),
+    ("write param rsp_ok",  _package_write_param, 0x02, b'',         True,  False, None),
+    ("write param rsp_err", _package_write_param, 0x03, b'\x29\x00', True,  True,  "WRITE_PROPERTY_FAILED"),
+    ("write param rsp_unk", _package_write_param, 0x03, b'\xFE\xDC', True,  True,  "unknown error 'fedc'"),
+]
+
+
 @pytest.mark.asyncio
-@pytest.mark.usefixtures("package_read_info", "package_read_param", "package_write_param")
 @pytest.mark.parametrize(
-    "name, fixture, modify_flags, modify_data, expected_isResponse, expected_isError, expected_getError",
-    [
-        ("read info req",       "package_read_info",   0x00, b'',         False, False, None),
-        ("read info rsp_ok",    "package_read_info",   0x02, b'',         True,  False, None),
-        ("read info rsp_err",   "package_read_info",   0x03, b'\x2A\x00', True,  True,  "READ_PROPERTY_FAILED"),
-        ("read info rsp_unk",   "package_read_info",   0x03, b'\xFE\xDC', True,  True,  "unknown error 'fedc'"),
-        ("read param req",      "package_read_param",  0x00, b'',         False, False, None),
-        ("read param rsp_ok",   "package_read_param",  0x02, b'',         True,  False, None),
-        ("read param rsp_err",  "package_read_param",  0x03, b'\x2A\x00', True,  True,  "READ_PROPERTY_FAILED"),
-        ("read param rsp_unk",  "package_read_param",  0x03, b'\xFE\xDC', True,  True,  "unknown error 'fedc'"),
-        ("write param req",     "package_write_param", 0x00, b'',         False, False, None),
-        ("write param rsp_ok",  "package_write_param", 0x02, b'',         True,  False, None),
-        ("write param rsp_err", "package_write_param", 0x03, b'\x29\x00', True,  True,  "WRITE_PROPERTY_FAILED"),
-        ("write param rsp_unk", "package_write_param", 0x03, b'\xFE\xDC', True,  True,  "unknown error 'fedc'"),
-    ]
+    "name, factory, modify_flags, modify_data, expected_isResponse, expected_isError, expected_getError",
+    _PACKAGE_FLAGS_CASES,
+    ids = [case[0] for case in _PACKAGE_FLAGS_CASES],
 )
-async def test_package_flags(name, fixture, modify_flags, modify_data, expected_isResponse, expected_isError, expected_getError, request):
+async def test_package_flags(name, factory, modify_flags, modify_data, expected_isResponse, expected_isError, expected_getError):
     # Modify the package
-    package: XcomPackage = request.getfixturevalue(fixture)
+    package: XcomPackage = factory()
     package.frame_data.service_flags = modify_flags
     package.frame_data.service_data.property_data = modify_data
     package.header.data_length = len(package.frame_data)
@@ -123,31 +167,184 @@ async def test_package_flags(name, fixture, modify_flags, modify_data, expected_
     assert clone.getError() == expected_getError
 
 
+_PACKAGE_RESPONSE_CASES = [
+    ("read info rsp_ok",    _package_read_info,   0x02, b'\x01\x02\x03\x04'),
+    ("read param rsp_err",  _package_read_param,  0x03, b'\x2A\x00'),
+    ("write param rsp_ok",  _package_write_param, 0x02, b''),
+]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "name, factory, rsp_flags, rsp_data",
+    _PACKAGE_RESPONSE_CASES,
+    ids = [case[0] for case in _PACKAGE_RESPONSE_CASES],
+)
+async def test_package_response(name, factory, rsp_flags, rsp_data):
+    req: XcomPackage = factory()
+    req_data = req.frame_data.service_data.property_data
+
+    rsp = XcomPackage.genResponse(req, rsp_flags, rsp_data)
+
+    # The request itself is left untouched
+    assert req.frame_data.service_flags == 0x00
+    assert req.frame_data.service_data.property_data == req_data
+
+    assert rsp.header.src_addr == req.header.dst_addr
+    assert rsp.header.dst_addr == req.header.src_addr
+    assert rsp.header.data_length == len(rsp.frame_data)
+    assert rsp.frame_data.service_id == req.frame_data.service_id
+    assert rsp.frame_data.service_flags == rsp_flags
+    assert rsp.frame_data.service_data.object_type == req.frame_data.service_data.object_type
+    assert rsp.frame_data.service_data.object_id == req.frame_data.service_data.object_id
+    assert rsp.frame_data.service_data.property_id == req.frame_data.service_data.property_id
+    assert rsp.frame_data.service_data.property_data == rsp_data
+
+    # Test getBytes and parseBytes
+    clone = await XcomPackage.parseBytes(rsp.getBytes())
+
+    assert clone.isResponse() == True
+    assert clone.frame_data.service_data.property_data == rsp_data
+
+    # Test parseBytesSync, including skipping of leading bytes before the start byte
+    clone = XcomPackage.parseBytesSync(b'\xFF' + rsp.getBytes())
+
+    assert str(clone) == str(rsp)
+
+    # Test parseBytesSync on a memoryview slice of a larger receive buffer
+    buf = bytearray(1500)
+    pkg = rsp.getBytes()
+    buf[:len(pkg)] = pkg
+    clone = XcomPackage.parseBytesSync(memoryview(buf)[:len(pkg)])
+
+    assert str(clone) == str(rsp)
+
+
+_CHECKSUM_CASES = [
+    ("empty",      b'',                b'\xFF\x00'),
+    ("short",      b'\x00\x01\x02',    b'\x02\x01'),
+    ("all bytes",  bytes(range(256)),  b'\x7F\x80'),
+    ("long",       b'\xFF' * 1000,     b'\x17\x04'),
+]
+
+
 @pytest.mark.parametrize(
-    "name, value, format, expected_length",
-    [
-        ("bool",       True, FORMAT.BOOL, 1),
-        ("short enum", 1234, FORMAT.SHORT_ENUM, 2),
-        ("int32",      1234, FORMAT.INT32, 4),
-        ("long enum",  1234, FORMAT.LONG_ENUM, 4),
-        ("float",      123.4, FORMAT.FLOAT, 4),
-        ("string",     "abcde", FORMAT.STRING, 5),
-    ]
+    "name, data, exp_checksum",
+    _CHECKSUM_CASES,
+    ids = [case[0] for case in _CHECKSUM_CASES],
 )
-def test_data(name, value, format, expected_length):
+def test_checksum(name, data, exp_checksum):
+    assert checksum(data) == exp_checksum
+
+
+_DATA_CASES = [
+    ("bool",       True,    FORMAT.BOOL,       b'\x01'),
+    ("error",      1234,    FORMAT.ERROR,      b'\xD2\x04'),
+    ("format",     1234,    FORMAT.FORMAT,     b'\xD2\x04'),
+    ("short enum", 1234,    FORMAT.SHORT_ENUM, b'\xD2\x04'),
+    ("int32",      1234,    FORMAT.INT32,      b'\xD2\x04\x00\x00'),
+    ("long enum",  1234,    FORMAT.LONG_ENUM,  b'\xD2\x04\x00\x00'),
+    ("float",      123.4,   FORMAT.FLOAT,      b'\xCD\xCC\xF6\x42'),
+    ("float -0",   -0.0,    FORMAT.FLOAT,      b'\x00\x00\x00\x80'),
+    ("string",     "abcde", FORMAT.STRING,     b'abcde'),
+]
+
+
+@pytest.mark.parametrize(
+    "name, value, format, exp_buf",
+    _DATA_CASES,
+    ids = [case[0] for case in _DATA_CASES],
+)
+def test_data(name, value, format, exp_buf):
+    expected_length = len(exp_buf)
+
     # test pack
     buf = XcomData.pack(value, format)
 
-    assert buf is not None
-    assert len(buf) == expected_length
+    assert buf == exp_buf
+
+    # test pack into a preallocated buffer, at an offset
+    buf_into = bytearray(expected_length + 2)
+
+    assert XcomData.pack_into(buf_into, 2, value, format) == expected_length
+    assert buf_into == b'\x00\x00' + buf
 
     # test unpack
-    clone = XcomData.unpack(buf, format)
+    clone = XcomData.unpack(exp_buf, format)
 
     assert type(clone) == type(value)
     match format:
         case FORMAT.FLOAT:
-            # carefull with comparing floats
-            assert clone == pytest.approx(value, abs=0.01)
+            # the value is stored as a 32 bit float; compare with the exact single precision round-trip
+            assert clone == struct.unpack("<f", struct.pack("<f", value))[0]
         case _:
             assert clone == value
+
+
+def test_data_unknown():
+    with pytest.raises(TypeError, match="Unknown data format 'UNKNOWN'"):
+        XcomData.unpack(b'\x00', "UNKNOWN")
+
+    with pytest.raises(TypeError, match="Unknown data format 'UNKNOWN'"):
+        XcomData.pack(0, "UNKNOWN")
+
+
+def test_data_multiinfo_req():
+    req = XcomDataMultiInfoReq()
+    req.append(XcomDataMultiInfoReqItem(3000, 0x00))
+    req.append(XcomDataMultiInfoReqItem(3001, 0x01))
+
+    buf = req.getBytes()
+
+    assert buf == b'\xB8\x0B\x00\xB9\x0B\x01'
+    assert len(buf) == len(req)
+
+    clone = XcomDataMultiInfoReq.parseBytes(buf)
+
+    assert [(item.user_info_ref, item.aggregation_type) for item in clone.items] == [(3000, 0x00), (3001, 0x01)]
+
+
+# Multi-info response items (user_info_ref, aggregation_type, value) and their packed bytes, built once per module
+_MULTIINFO_ITEMS = [
+    (3000, 0x00, 48.5),
+    (3000, 0x01, 12.25),
+    (3001, 0x00, -1.0),
+]
+_MULTIINFO_BYTES = struct.pack("<II", 0x01, 0x12345678) + b''.join(struct.pack("<HBf", *item) for item in _MULTIINFO_ITEMS)
+
+
+def test_data_multiinfo():
+    items = _MULTIINFO_ITEMS
+    rsp = XcomDataMultiInfoRsp.parseBytes(_MULTIINFO_BYTES)
+
+    assert rsp.flags == 0x01
+    assert rsp.datetime == 0x12345678
+    assert len(rsp.items) == len(items)
+    assert len(rsp) == len(_MULTIINFO_BYTES)
+
+    # Index the parsed items once, instead of scanning them for every expected item
+    rsp_index = {(item.user_info_ref, item.aggregation_type): item for item in rsp.items}
+
+    for (user_info_ref, aggregation_type, value) in items:
+        item = rsp_index.get((user_info_ref, aggregation_type))
+        assert item is not None
+        assert item.value == value
+
+    # Test getBytes
+    buf = rsp.getBytes()
+
+    assert type(buf) is bytes
+    assert len(buf) == len(items) * 7 + 8
+    assert buf == _MULTIINFO_BYTES
+
+
+def test_data_multiinfo_bulk():
+    items = [XcomDataMultiInfoRspItem(3000 + idx, idx % 16, float(idx)) for idx in range(100)]
+    buf = XcomDataMultiInfoRsp(0x00, 0, items).getBytes()
+
+    # A trailing partial item is ignored
+    rsp = XcomDataMultiInfoRsp.parseBytes(buf + b'\x01\x02')
+
+    assert len(rsp.items) == len(items)
+    assert [(item.user_info_ref, item.aggregation_type, item.value) for item in rsp.items] == \
+           [(item.user_info_ref, item.aggregation_type, item.value) for item in items]
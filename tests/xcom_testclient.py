@@ -1,6 +1,7 @@
 """xcom_api.py: communication api to Studer Xcom via LAN."""
 
 import asyncio
+import contextlib
 import logging
 import socket
 
@@ -8,6 +9,7 @@ from aioxcom import  (
     XcomApiTimeoutException,
     XcomApiReadException,
     XcomApiWriteException,
+    XcomApiTcp,
     XcomPackage,
 )
 
@@ -19,6 +21,9 @@ START_TIMEOUT = 30 # seconds
 STOP_TIMEOUT = 5
 REQ_TIMEOUT = 2
 REQ_RETRIES = 3
+STREAM_LIMIT = 65536
+
+_NULL_LOCK = contextlib.nullcontext()   # stand-in for a lock when calls are already made one at a time
 
 
 ##
@@ -26,10 +31,11 @@ REQ_RETRIES = 3
 ##
 class XcomTestClientTcp:
 
-    def __init__(self, port=DEFAULT_PORT):
+    def __init__(self, port=DEFAULT_PORT, serialize=False):
         """
         MOXA is connecting to the TCP Server we are creating here.
         Once it is connected we can send package requests.
+        Pass serialize=True when receivePackage or sendPackage can be called from concurrent tasks.
         """
         super().__init__()
 
@@ -39,8 +45,8 @@ class XcomTestClientTcp:
         self._started = False
         self._connected = False
 
-        self._receivePackageLock = asyncio.Lock() # to make sure receivePackage is never called concurrently
-        self._sendPackageLock    = asyncio.Lock() # to make sure sendPackage is never called concurrently
+        self._receivePackageLock = asyncio.Lock() if serialize else _NULL_LOCK # to make sure receivePackage is never called concurrently
+        self._sendPackageLock    = asyncio.Lock() if serialize else _NULL_LOCK # to make sure sendPackage is never called concurrently
 
 
     @property
@@ -56,7 +62,7 @@ class XcomTestClientTcp:
         if not self._started:
             _LOGGER.info(f"Xcom TCP Test Client connect to port {self.localPort}")
 
-            self._reader, self._writer = await asyncio.open_connection("127.0.0.1", self.localPort, limit=1000, family=socket.AF_INET)
+            self._reader, self._writer = await asyncio.open_connection("127.0.0.1", self.localPort, limit=STREAM_LIMIT, family=socket.AF_INET)
 
             peername = self._writer.get_extra_info("peername")
             _LOGGER.info(f"Connected to Xcom server '{peername}'")
@@ -72,13 +78,17 @@ class XcomTestClientTcp:
         Stop listening to the the Xcom Server and stop the Xcom TCP Test Client
         """
         _LOGGER.info(f"Stopping Xcom TCP Test Client")
-        try:
-            self._connected = False
+        self._connected = False
+
+        # Take over the writer in a single step, so a concurrent stop cannot close it twice
+        writer, self._writer = self._writer, None
+        self._reader = None
 
+        try:
             # Close the writer; we do not need to close the reader
-            if self._writer:
-                self._writer.close()
-                await self._writer.wait_closed()
+            if writer:
+                writer.close()
+                await writer.wait_closed()
     
         except Exception as e:
             _LOGGER.warning(f"Exception during closing of Xcom writer: {e}")
@@ -90,6 +100,7 @@ class XcomTestClientTcp:
     async def receivePackage(self, timeout=REQ_TIMEOUT) -> XcomPackage | None:
         """
         Receive an Xcom package from Server to Client
+        Pass timeout=None to block until a package arrives (or the call is cancelled)
         Throws:
             XcomApiWriteException
             XcomApiReadException
@@ -103,12 +114,10 @@ class XcomTestClientTcp:
             # Receive a package
             try:
                 async with asyncio.timeout(timeout):
-                    while True:
-                        request = await XcomPackage.parse(self._reader)
+                    request = await XcomPackage.parse(self._reader)
 
-                        if request is not None:
-                            _LOGGER.info(f"Xcom TCP Test Client received request package {request}")
-                            return request
+                _LOGGER.debug("Xcom TCP Test Client received request package %s", request)
+                return request
 
             except asyncio.TimeoutError as te:
                 raise XcomApiTimeoutException(f"Timeout while listening for request package from Xcom server") from None
@@ -132,9 +141,46 @@ class XcomTestClientTcp:
         async with self._sendPackageLock:
             # Send the package to the Xcom server
             try:
-                _LOGGER.info(f"Xcom TCP Test Client send response package {package}")
+                _LOGGER.debug("Xcom TCP Test Client send response package %s", package)
                 self._writer.write(package.getBytes())
                 await self._writer.drain()
 
             except Exception as e:
                 raise XcomApiWriteException(f"Exception while sending package to Xcom server: {e}") from None
+
+
+##
+## Server and test client pair used by the api and discover tests
+##
+class XcomTestContext:
+    def __init__(self):
+        self.server = None
+        self.client = None
+        self.client_stop = None
+
+    async def start_server(self, port):
+        if not self.server:
+            self.server = XcomApiTcp(port)
+
+        await self.server.start(wait_for_connect = False)
+
+    async def stop_server(self):
+        if self.server:
+            await self.server.stop()
+        self.server = None
+
+    async def start_client(self, port):
+        if not self.client:
+            self.client = XcomTestClientTcp(port)
+
+        # Fresh stop event for each client run, created within the running loop
+        self.client_stop = asyncio.Event()
+        await self.client.start()
+
+    async def stop_client(self):
+        if self.client:
+            # Release a client handler that is still running
+            if self.client_stop:
+                self.client_stop.set()
+            await self.client.stop()
+        self.client = None